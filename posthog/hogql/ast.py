@@ -26,10 +26,10 @@ from posthog.hogql.database.models import (
 from posthog.hogql.errors import HogQLException, NotImplementedException
 
 # :NOTE: when you add new AST fields or nodes, add them to CloningVisitor and TraversingVisitor in visitor.py as well.
-# :NOTE2: also search for ":TRICKY:" in "resolver.py" when modifying SelectQuery or JoinExpr
+# :NOTE2: also search for ":TRICKY:" in "resolver.py" when modifying SelectQuery, JoinExpr or Call
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class FieldAliasType(Type):
     alias: str
     type: Type
@@ -58,7 +58,7 @@ class FieldAliasType(Type):
         raise NotImplementedException("FieldAliasType.resolve_table_type not implemented")
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class BaseTableType(Type):
     def resolve_database_table(self, context: HogQLContext) -> Table:
         raise NotImplementedException("BaseTableType.resolve_database_table not overridden")
@@ -85,7 +85,7 @@ class BaseTableType(Type):
         raise HogQLException(f"Field not found: {name}")
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class TableType(BaseTableType):
     table: Table
 
@@ -93,7 +93,7 @@ class TableType(BaseTableType):
         return self.table
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class TableAliasType(BaseTableType):
     alias: str
     table_type: TableType
@@ -102,7 +102,7 @@ class TableAliasType(BaseTableType):
         return self.table_type.table
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class LazyJoinType(BaseTableType):
     table_type: BaseTableType
     field: str
@@ -112,7 +112,7 @@ class LazyJoinType(BaseTableType):
         return self.lazy_join.resolve_table(context)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class LazyTableType(BaseTableType):
     table: LazyTable
 
@@ -120,7 +120,7 @@ class LazyTableType(BaseTableType):
         return self.table
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class VirtualTableType(BaseTableType):
     table_type: BaseTableType
     field: str
@@ -136,7 +136,7 @@ class VirtualTableType(BaseTableType):
 TableOrSelectType = Union[BaseTableType, "SelectUnionQueryType", "SelectQueryType", "SelectQueryAliasType"]
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class SelectQueryType(Type):
     """Type and new enclosed scope for a select query. Contains information about all tables and columns in the query."""
 
@@ -169,7 +169,7 @@ class SelectQueryType(Type):
         return name in self.columns
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class SelectUnionQueryType(Type):
     types: List[SelectQueryType]
 
@@ -183,7 +183,7 @@ class SelectUnionQueryType(Type):
         return self.types[0].has_child(name, context)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class SelectQueryAliasType(Type):
     alias: str
     select_query_type: SelectQueryType | SelectUnionQueryType
@@ -199,7 +199,7 @@ class SelectQueryAliasType(Type):
         return self.select_query_type.has_child(name, context)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class IntegerType(ConstantType):
     data_type: ConstantDataType = field(default="int", init=False)
 
@@ -207,7 +207,7 @@ class IntegerType(ConstantType):
         return "Integer"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class FloatType(ConstantType):
     data_type: ConstantDataType = field(default="float", init=False)
 
@@ -215,7 +215,7 @@ class FloatType(ConstantType):
         return "Float"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class StringType(ConstantType):
     data_type: ConstantDataType = field(default="str", init=False)
 
@@ -223,7 +223,7 @@ class StringType(ConstantType):
         return "String"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class BooleanType(ConstantType):
     data_type: ConstantDataType = field(default="bool", init=False)
 
@@ -231,7 +231,7 @@ class BooleanType(ConstantType):
         return "Boolean"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class DateType(ConstantType):
     data_type: ConstantDataType = field(default="date", init=False)
 
@@ -239,7 +239,7 @@ class DateType(ConstantType):
         return "Date"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class DateTimeType(ConstantType):
     data_type: ConstantDataType = field(default="datetime", init=False)
 
@@ -247,7 +247,7 @@ class DateTimeType(ConstantType):
         return "DateTime"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class UUIDType(ConstantType):
     data_type: ConstantDataType = field(default="uuid", init=False)
 
@@ -255,7 +255,7 @@ class UUIDType(ConstantType):
         return "UUID"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ArrayType(ConstantType):
     data_type: ConstantDataType = field(default="array", init=False)
     item_type: ConstantType
@@ -264,7 +264,7 @@ class ArrayType(ConstantType):
         return "Array"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class TupleType(ConstantType):
     data_type: ConstantDataType = field(default="tuple", init=False)
     item_types: List[ConstantType]
@@ -273,7 +273,7 @@ class TupleType(ConstantType):
         return "Tuple"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class CallType(Type):
     name: str
     arg_types: List[ConstantType]
@@ -284,25 +284,25 @@ class CallType(Type):
         return self.return_type
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class AsteriskType(Type):
     table_type: TableOrSelectType
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class FieldTraverserType(Type):
     chain: List[str | int]
     table_type: TableOrSelectType
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ExpressionFieldType(Type):
     name: str
     expr: Expr
     table_type: TableOrSelectType
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class FieldType(Type):
     name: str
     table_type: TableOrSelectType
@@ -337,7 +337,10 @@ class FieldType(Type):
         return UnknownType()
 
     def get_child(self, name: str | int, context: HogQLContext) -> Type:
-        database_field = self.resolve_database_field(context)
+        return self.get_property_type(name, self.resolve_database_field(context))
+
+    def get_property_type(self, name: str | int, database_field: Optional[FieldOrTable]) -> Type:
+        """Like get_child, for callers that have already resolved this field's database field."""
         if database_field is None:
             raise HogQLException(f'Can not access property "{name}" on field "{self.name}".')
         if isinstance(database_field, StringJSONDatabaseField):
@@ -352,7 +355,7 @@ class FieldType(Type):
         return self.table_type
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class PropertyType(Type):
     chain: List[str | int]
     field_type: FieldType
@@ -368,12 +371,12 @@ class PropertyType(Type):
         return True
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class LambdaArgumentType(Type):
     name: str
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Alias(Expr):
     alias: str
     expr: Expr
@@ -393,20 +396,20 @@ class ArithmeticOperationOp(str, Enum):
     Mod = "%"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ArithmeticOperation(Expr):
     left: Expr
     right: Expr
     op: ArithmeticOperationOp
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class And(Expr):
     type: Optional[ConstantType] = None
     exprs: List[Expr]
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Or(Expr):
     exprs: List[Expr]
     type: Optional[ConstantType] = None
@@ -435,7 +438,7 @@ class CompareOperationOp(str, Enum):
     NotIRegex = "!~*"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class CompareOperation(Expr):
     left: Expr
     right: Expr
@@ -443,63 +446,64 @@ class CompareOperation(Expr):
     type: Optional[ConstantType] = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Not(Expr):
     expr: Expr
     type: Optional[ConstantType] = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class OrderExpr(Expr):
     expr: Expr
     order: Literal["ASC", "DESC"] = "ASC"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ArrayAccess(Expr):
     array: Expr
     property: Expr
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Array(Expr):
     exprs: List[Expr]
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class TupleAccess(Expr):
     tuple: Expr
     index: int
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Tuple(Expr):
     exprs: List[Expr]
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Lambda(Expr):
     args: List[str]
     expr: Expr
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Constant(Expr):
     value: Any
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Field(Expr):
     chain: List[str | int]
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Placeholder(Expr):
     field: str
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Call(Expr):
+    # :TRICKY: When adding new fields, make sure they're handled in visitor.py and resolver.py
     name: str
     """Function name"""
     args: List[Expr]
@@ -511,12 +515,12 @@ class Call(Expr):
     distinct: bool = False
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class JoinConstraint(Expr):
     expr: Expr
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class JoinExpr(Expr):
     # :TRICKY: When adding new fields, make sure they're handled in visitor.py and resolver.py
     type: Optional[TableOrSelectType] = None
@@ -531,13 +535,13 @@ class JoinExpr(Expr):
     sample: Optional["SampleExpr"] = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class WindowFrameExpr(Expr):
     frame_type: Optional[Literal["CURRENT ROW", "PRECEDING", "FOLLOWING"]] = None
     frame_value: Optional[int] = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class WindowExpr(Expr):
     partition_by: Optional[List[Expr]] = None
     order_by: Optional[List[OrderExpr]] = None
@@ -546,7 +550,7 @@ class WindowExpr(Expr):
     frame_end: Optional[WindowFrameExpr] = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class WindowFunction(Expr):
     name: str
     args: Optional[List[Expr]] = None
@@ -554,7 +558,7 @@ class WindowFunction(Expr):
     over_identifier: Optional[str] = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class SelectQuery(Expr):
     # :TRICKY: When adding new fields, make sure they're handled in visitor.py and resolver.py
     type: Optional[SelectQueryType] = None
@@ -577,32 +581,32 @@ class SelectQuery(Expr):
     settings: Optional[HogQLQuerySettings] = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class SelectUnionQuery(Expr):
     type: Optional[SelectUnionQueryType] = None
     select_queries: List[SelectQuery]
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class RatioExpr(Expr):
     left: Constant
     right: Optional[Constant] = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class SampleExpr(Expr):
     # k or n
     sample_value: RatioExpr
     offset_value: Optional[RatioExpr] = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class HogQLXAttribute(AST):
     name: str
     value: Any
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class HogQLXTag(AST):
     kind: str
     attributes: List[HogQLXAttribute]
@@ -1,7 +1,7 @@
 import re
 from dataclasses import dataclass, field
 
-from typing import TYPE_CHECKING, Literal, Optional
+from typing import TYPE_CHECKING, Dict, Literal, Optional
 
 from posthog.hogql.constants import ConstantDataType
 from posthog.hogql.errors import NotImplementedException
@@ -13,29 +13,41 @@ if TYPE_CHECKING:
 camel_case_pattern = re.compile(r"(?<!^)(?<![A-Z])(?=[A-Z])")
 
 
-@dataclass(kw_only=True)
-class AST:
-    start: Optional[int] = field(default=None)
-    end: Optional[int] = field(default=None)
+# Visitor method names per AST class, as the name is needed for every node visited
+_visit_method_names: Dict[type, str] = {}
 
-    # This is part of the visitor pattern from visitor.py.
-    def accept(self, visitor):
-        name = camel_case_pattern.sub("_", self.__class__.__name__).lower()
+
+def visit_method_name(cls: type) -> str:
+    """Name of the visitor method for an AST class, e.g. "visit_select_query" for SelectQuery."""
+    method_name = _visit_method_names.get(cls)
+    if method_name is None:
+        name = camel_case_pattern.sub("_", cls.__name__).lower()
 
         # NOTE: Sync with ./test/test_visitor.py#test_hogql_visitor_naming_exceptions
         replacements = {"hog_qlxtag": "hogqlx_tag", "hog_qlxattribute": "hogqlx_attribute", "uuidtype": "uuid_type"}
         for old, new in replacements.items():
             name = name.replace(old, new)
-        method_name = f"visit_{name}"
-        if hasattr(visitor, method_name):
-            visit = getattr(visitor, method_name)
+        method_name = _visit_method_names[cls] = f"visit_{name}"
+    return method_name
+
+
+@dataclass(kw_only=True, slots=True)
+class AST:
+    start: Optional[int] = field(default=None)
+    end: Optional[int] = field(default=None)
+
+    # This is part of the visitor pattern from visitor.py.
+    def accept(self, visitor):
+        method_name = visit_method_name(self.__class__)
+        visit = getattr(visitor, method_name, None)
+        if visit is not None:
             return visit(self)
         if hasattr(visitor, "visit_unknown"):
             return visitor.visit_unknown(self)
         raise NotImplementedException(f"{visitor.__class__.__name__} has no method {method_name}")
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Type(AST):
     def get_child(self, name: str, context: "HogQLContext") -> "Type":
         raise NotImplementedException("Type.get_child not overridden")
@@ -47,12 +59,12 @@ class Type(AST):
         return UnknownType()
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Expr(AST):
     type: Optional[Type] = field(default=None)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class CTE(Expr):
     """A common table expression."""
 
@@ -62,7 +74,7 @@ class CTE(Expr):
     cte_type: Literal["column", "subquery"]
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ConstantType(Type):
     data_type: ConstantDataType
 
@@ -73,7 +85,7 @@ class ConstantType(Type):
         raise NotImplementedException("ConstantType.print_type not implemented")
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class UnknownType(ConstantType):
     data_type: ConstantDataType = field(default="unknown", init=False)
 
@@ -1,5 +1,6 @@
+from copy import copy
 from datetime import date, datetime
-from typing import List, Optional, Any, cast, Literal
+from typing import Dict, List, Optional, Any, Set, cast, Literal
 from uuid import UUID
 
 from posthog.hogql import ast
@@ -11,13 +12,19 @@ from posthog.hogql.database.models import (
     FunctionCallTable,
     LazyTable,
     SavedQuery,
+    Table,
 )
 from posthog.hogql.errors import ResolverException
 from posthog.hogql.functions.cohort import cohort_query_node
 from posthog.hogql.functions.mapping import validate_function_args
 from posthog.hogql.functions.sparkline import sparkline
 from posthog.hogql.parser import parse_select
-from posthog.hogql.resolver_utils import convert_hogqlx_tag, lookup_cte_by_name, lookup_field_by_name
+from posthog.hogql.resolver_utils import (
+    convert_hogqlx_tag,
+    lookup_field_by_name,
+    unwrap_alias,
+    ScopeStack,
+)
 from posthog.hogql.visitor import CloningVisitor, clone_expr, TraversingVisitor
 from posthog.models.utils import UUIDT
 from posthog.hogql.database.schema.events import EventsTable
@@ -26,30 +33,59 @@ from posthog.hogql.database.s3_table import S3Table
 # https://github.com/ClickHouse/ClickHouse/issues/23194 - "Describe how identifiers in SELECT queries are resolved"
 
 
+# Types without any data are shared between all nodes, instead of creating a new object for every constant.
+_UNKNOWN_TYPE = ast.UnknownType()
+_BOOLEAN_TYPE = ast.BooleanType()
+_INTEGER_TYPE = ast.IntegerType()
+_FLOAT_TYPE = ast.FloatType()
+_STRING_TYPE = ast.StringType()
+_DATE_TIME_TYPE = ast.DateTimeType()
+_DATE_TYPE = ast.DateType()
+_UUID_TYPE = ast.UUIDType()
+
+# Exact-type lookup for the most common constants. Subclasses (e.g. freezegun's FakeDatetime) fall through to the
+# isinstance checks in resolve_constant_data_type.
+_CONSTANT_DATA_TYPES: Dict[type, ConstantType] = {
+    type(None): _UNKNOWN_TYPE,
+    bool: _BOOLEAN_TYPE,
+    int: _INTEGER_TYPE,
+    float: _FLOAT_TYPE,
+    str: _STRING_TYPE,
+    datetime: _DATE_TIME_TYPE,
+    date: _DATE_TYPE,
+    UUID: _UUID_TYPE,
+    UUIDT: _UUID_TYPE,
+}
+
+
 def resolve_constant_data_type(constant: Any) -> ConstantType:
-    if constant is None:
-        return ast.UnknownType()
+    constant_data_type = _CONSTANT_DATA_TYPES.get(type(constant))
+    if constant_data_type is not None:
+        return constant_data_type
     if isinstance(constant, bool):
-        return ast.BooleanType()
+        return _BOOLEAN_TYPE
     if isinstance(constant, int):
-        return ast.IntegerType()
+        return _INTEGER_TYPE
     if isinstance(constant, float):
-        return ast.FloatType()
+        return _FLOAT_TYPE
     if isinstance(constant, str):
-        return ast.StringType()
+        return _STRING_TYPE
     if isinstance(constant, list):
-        unique_types = set(str(resolve_constant_data_type(item)) for item in constant)
-        return ast.ArrayType(
-            item_type=resolve_constant_data_type(constant[0]) if len(unique_types) == 1 else ast.UnknownType()
-        )
+        if len(constant) == 0:
+            return ast.ArrayType(item_type=_UNKNOWN_TYPE)
+        item_type = resolve_constant_data_type(constant[0])
+        for item in constant[1:]:
+            if resolve_constant_data_type(item) != item_type:
+                return ast.ArrayType(item_type=_UNKNOWN_TYPE)
+        return ast.ArrayType(item_type=item_type)
     if isinstance(constant, tuple):
         return ast.TupleType(item_types=[resolve_constant_data_type(item) for item in constant])
     if isinstance(constant, datetime) or type(constant).__name__ == "FakeDatetime":
-        return ast.DateTimeType()
+        return _DATE_TIME_TYPE
     if isinstance(constant, date) or type(constant).__name__ == "FakeDate":
-        return ast.DateType()
+        return _DATE_TYPE
     if isinstance(constant, UUID) or isinstance(constant, UUIDT):
-        return ast.UUIDType()
+        return _UUID_TYPE
     raise ResolverException(f"Unsupported constant type: {type(constant)}")
 
 
@@ -83,21 +119,42 @@ class Resolver(CloningVisitor):
     ):
         super().__init__()
         # Each SELECT query creates a new scope (type). Store all of them in a list as we traverse the tree.
-        self.scopes: List[ast.SelectQueryType] = scopes or []
+        self.scopes: List[ast.SelectQueryType] = []
+        # The CTEs of all scopes, so that the innermost CTE with a given name can be found without walking the scopes.
+        self.ctes: ScopeStack[ast.CTE] = ScopeStack()
+        for scope in scopes or []:
+            self._push_scope(scope)
         self.current_view_depth: int = 0
         self.context = context
         self.dialect = dialect
         self.database = context.database
         self.cte_counter = 0
+        self._database_tables: Dict[str, Optional[Table]] = {}
+
+    def _push_scope(self, scope: ast.SelectQueryType):
+        self.scopes.append(scope)
+        self.ctes.push()
+        if scope and scope.ctes:
+            for name, cte in scope.ctes.items():
+                self.ctes.bind(name, cte)
+
+    def _pop_scope(self):
+        self.scopes.pop()
+        self.ctes.pop()
 
     def visit(self, node: ast.Expr) -> ast.Expr:
+        if node is None:
+            return node
         if isinstance(node, ast.Expr) and node.type is not None:
             raise ResolverException(
                 f"Type already resolved for {type(node).__name__} ({type(node.type).__name__}). Can't run again."
             )
+        return super().visit(node)
+
+    def _enter_cte(self):
+        self.cte_counter += 1
         if self.cte_counter > 50:
             raise ResolverException("Too many CTE expansions (50+). Probably a CTE loop.")
-        return super().visit(node)
 
     def visit_select_union_query(self, node: ast.SelectUnionQuery):
         node = super().visit_select_union_query(node)
@@ -116,7 +173,7 @@ class Resolver(CloningVisitor):
             node_type.ctes = node.ctes
 
         # Append the "scope" onto the stack early, so that nodes we "self.visit" below can access it.
-        self.scopes.append(node_type)
+        self._push_scope(node_type)
 
         # Clone the select query, piece by piece
         new_node = ast.SelectQuery(
@@ -134,49 +191,45 @@ class Resolver(CloningVisitor):
 
         # Array joins (pass 1 - so we can use aliases from the array join in columns)
         new_node.array_join_op = node.array_join_op
-        ac = AliasCollector()
         array_join_aliases = []
         if node.array_join_list:
+            ac = AliasCollector()
             for expr in node.array_join_list:
                 ac.visit(expr)
             array_join_aliases = ac.aliases
             for key in array_join_aliases:
                 if key in node_type.aliases:
                     raise ResolverException(f"Cannot redefine an alias with the name: {key}")
-                node_type.aliases[key] = ast.FieldAliasType(alias=key, type=ast.UnknownType())
+                node_type.aliases[key] = ast.FieldAliasType(alias=key, type=_UNKNOWN_TYPE)
 
         # Visit all the "SELECT a,b,c" columns. Mark each for export in "columns".
         select_nodes = []
         for expr in node.select or []:
             new_expr = self.visit(expr)
             if isinstance(new_expr.type, ast.AsteriskType):
-                columns = self._asterisk_columns(new_expr.type)
-                select_nodes.extend([self.visit(expr) for expr in columns])
+                select_nodes.extend(self._asterisk_columns(new_expr.type))
             else:
                 select_nodes.append(new_expr)
 
-        columns_with_visible_alias = {}
+        visible_aliases: Set[str] = set()
         for new_expr in select_nodes:
-            if isinstance(new_expr.type, ast.FieldAliasType):
-                alias = new_expr.type.alias
-            elif isinstance(new_expr.type, ast.FieldType):
-                alias = new_expr.type.name
-            elif isinstance(new_expr.type, ast.ExpressionFieldType):
-                alias = new_expr.type.name
-            elif isinstance(new_expr, ast.Alias):
-                alias = new_expr.alias
-            else:
-                alias = None
+            alias: Optional[str]
+            match new_expr.type:
+                case ast.FieldAliasType(alias=alias):
+                    pass
+                case ast.FieldType(name=alias) | ast.ExpressionFieldType(name=alias):
+                    pass
+                case _:
+                    alias = new_expr.alias if isinstance(new_expr, ast.Alias) else None
 
             if alias:
                 # Make a reference of the first visible or last hidden expr for each unique alias name.
                 if isinstance(new_expr, ast.Alias) and new_expr.hidden:
-                    if alias not in node_type.columns or not columns_with_visible_alias.get(alias, False):
+                    if alias not in visible_aliases:
                         node_type.columns[alias] = new_expr.type
-                        columns_with_visible_alias[alias] = False
                 else:
                     node_type.columns[alias] = new_expr.type
-                    columns_with_visible_alias[alias] = True
+                    visible_aliases.add(alias)
 
             # add the column to the new select query
             new_node.select.append(new_expr)
@@ -190,34 +243,41 @@ class Resolver(CloningVisitor):
             new_node.array_join_list = [self.visit(expr) for expr in node.array_join_list]
 
         # :TRICKY: Make sure to clone and visit _all_ SelectQuery nodes.
-        new_node.where = self.visit(node.where)
-        new_node.prewhere = self.visit(node.prewhere)
-        new_node.having = self.visit(node.having)
+        # These clauses are usually empty, so check for that here instead of dispatching through self.visit.
+        visit = self.visit
+        if node.where is not None:
+            new_node.where = visit(node.where)
+        if node.prewhere is not None:
+            new_node.prewhere = visit(node.prewhere)
+        if node.having is not None:
+            new_node.having = visit(node.having)
         if node.group_by:
-            new_node.group_by = [self.visit(expr) for expr in node.group_by]
+            new_node.group_by = [visit(expr) for expr in node.group_by]
         if node.order_by:
-            new_node.order_by = [self.visit(expr) for expr in node.order_by]
+            new_node.order_by = [visit(expr) for expr in node.order_by]
         if node.limit_by:
-            new_node.limit_by = [self.visit(expr) for expr in node.limit_by]
-        new_node.limit = self.visit(node.limit)
+            new_node.limit_by = [visit(expr) for expr in node.limit_by]
+        if node.limit is not None:
+            new_node.limit = visit(node.limit)
         new_node.limit_with_ties = node.limit_with_ties
-        new_node.offset = self.visit(node.offset)
+        if node.offset is not None:
+            new_node.offset = visit(node.offset)
         new_node.distinct = node.distinct
-        new_node.window_exprs = (
-            {name: self.visit(expr) for name, expr in node.window_exprs.items()} if node.window_exprs else None
-        )
-        new_node.settings = node.settings.model_copy() if node.settings is not None else None
+        if node.window_exprs:
+            new_node.window_exprs = {name: visit(expr) for name, expr in node.window_exprs.items()}
+        # Settings are never mutated after parsing, so the resolved query can share them with the original
+        new_node.settings = node.settings
 
-        self.scopes.pop()
+        self._pop_scope()
 
         return new_node
 
     def _asterisk_columns(self, asterisk: ast.AsteriskType) -> List[ast.Expr]:
-        """Expand an asterisk. Mutates `select_query.select` and `select_query.type.columns` with the new fields"""
+        """Expand an asterisk into a list of resolved fields"""
         if isinstance(asterisk.table_type, ast.BaseTableType):
             table = asterisk.table_type.resolve_database_table(self.context)
             database_fields = table.get_asterisk()
-            return [ast.Field(chain=[key]) for key in database_fields.keys()]
+            return [self.visit(ast.Field(chain=[key])) for key in database_fields.keys()]
         elif (
             isinstance(asterisk.table_type, ast.SelectUnionQueryType)
             or isinstance(asterisk.table_type, ast.SelectQueryType)
@@ -229,7 +289,7 @@ class Resolver(CloningVisitor):
             if isinstance(select, ast.SelectUnionQueryType):
                 select = select.types[0]
             if isinstance(select, ast.SelectQueryType):
-                return [ast.Field(chain=[key]) for key in select.columns.keys()]
+                return [self.visit(ast.Field(chain=[key])) for key in select.columns.keys()]
             else:
                 raise ResolverException("Can't expand asterisk (*) on subquery")
         else:
@@ -244,21 +304,21 @@ class Resolver(CloningVisitor):
         scope = self.scopes[-1]
 
         if isinstance(node.table, ast.HogQLXTag):
+            node = copy(node)
             node.table = convert_hogqlx_tag(node.table, self.context.team_id)
 
         # If selecting from a CTE, expand and visit the new node
         if isinstance(node.table, ast.Field) and len(node.table.chain) == 1:
             table_name = node.table.chain[0]
-            cte = lookup_cte_by_name(self.scopes, table_name)
+            cte = self.ctes.get(table_name) if isinstance(table_name, str) else None
             if cte:
-                node = cast(ast.JoinExpr, clone_expr(node))
-                node.table = clone_expr(cte.expr)
+                if not isinstance(cte.expr, ast.SelectQuery) and not isinstance(cte.expr, ast.SelectUnionQuery):
+                    raise ResolverException(f"JoinExpr with table of type {type(cte.expr).__name__} not supported")
+                # A shallow copy is enough, as the table is replaced and every other child node is visited below.
+                node = copy(node)
+                node.table = self._visit_cte_subquery(cte)
                 node.alias = table_name
-
-                self.cte_counter += 1
-                response = self.visit(node)
-                self.cte_counter -= 1
-                return response
+                return self._visit_join_subquery(node)
 
         if isinstance(node.table, ast.Field):
             table_name = node.table.chain[0]
@@ -266,15 +326,15 @@ class Resolver(CloningVisitor):
             if table_alias in scope.tables:
                 raise ResolverException(f'Already have joined a table called "{table_alias}". Can\'t redefine.')
 
-            if self.database.has_table(table_name):
-                database_table = self.database.get_table(table_name)
-
+            database_table = self._get_database_table(table_name) if isinstance(table_name, str) else None
+            if database_table is not None:
                 if isinstance(database_table, SavedQuery):
                     self.current_view_depth += 1
 
                     if self.current_view_depth > self.context.max_view_depth:
                         raise ResolverException("Nested views are not supported")
 
+                    node = copy(node)
                     node.table = parse_select(str(database_table.query))
                     node.alias = table_alias or database_table.name
                     node = self.visit(node)
@@ -296,7 +356,8 @@ class Resolver(CloningVisitor):
                 scope.tables[table_alias] = node_type
 
                 # :TRICKY: Make sure to clone and visit _all_ JoinExpr fields/nodes.
-                node = cast(ast.JoinExpr, clone_expr(node))
+                # A shallow copy is enough, as every child node is cloned or visited below.
+                node = copy(node)
                 node.type = node_type
                 node.table = cast(ast.Field, clone_expr(node.table))
                 node.table.type = node_table_type
@@ -305,12 +366,7 @@ class Resolver(CloningVisitor):
                 node.next_join = self.visit(node.next_join)
 
                 # Look ahead if current is events table and next is s3 table, global join must be used for distributed query on external data to work
-                if isinstance(node.type, ast.TableAliasType):
-                    is_global = isinstance(node.type.table_type.table, EventsTable) and self._is_next_s3(node.next_join)
-                else:
-                    is_global = isinstance(node.type.table, EventsTable) and self._is_next_s3(node.next_join)
-
-                if is_global:
+                if isinstance(self._database_table_of(node.type), EventsTable) and self._is_next_s3(node.next_join):
                     node.next_join.join_type = "GLOBAL JOIN"
 
                 node.constraint = self.visit(node.constraint)
@@ -325,28 +381,50 @@ class Resolver(CloningVisitor):
                 raise ResolverException(f'Unknown table "{table_name}".')
 
         elif isinstance(node.table, ast.SelectQuery) or isinstance(node.table, ast.SelectUnionQuery):
-            node = cast(ast.JoinExpr, clone_expr(node))
-
+            # A shallow copy is enough, as every child node is visited below.
+            node = copy(node)
             node.table = super().visit(node.table)
-            if node.alias is not None:
-                if node.alias in scope.tables:
-                    raise ResolverException(
-                        f'Already have joined a table called "{node.alias}". Can\'t join another one with the same name.'
-                    )
-                node.type = ast.SelectQueryAliasType(alias=node.alias, select_query_type=node.table.type)
-                scope.tables[node.alias] = node.type
-            else:
-                node.type = node.table.type
-                scope.anonymous_tables.append(node.type)
+            return self._visit_join_subquery(node)
+        else:
+            raise ResolverException(f"JoinExpr with table of type {type(node.table).__name__} not supported")
 
-            # :TRICKY: Make sure to clone and visit _all_ JoinExpr fields/nodes.
-            node.next_join = self.visit(node.next_join)
-            node.constraint = self.visit(node.constraint)
-            node.sample = self.visit(node.sample)
+    def _get_database_table(self, table_name: str) -> Optional[Table]:
+        """Memoized database table lookup, as queries often join the same tables many times."""
+        if table_name not in self._database_tables:
+            self._database_tables[table_name] = (
+                self.database.get_table(table_name) if self.database.has_table(table_name) else None
+            )
+        return self._database_tables[table_name]
 
-            return node
+    def _visit_join_subquery(self, node: ast.JoinExpr) -> ast.JoinExpr:
+        """Finish visiting a cloned JoinExpr, whose subquery in `node.table` has already been resolved."""
+        scope = self.scopes[-1]
+        if node.alias is not None:
+            if node.alias in scope.tables:
+                raise ResolverException(
+                    f'Already have joined a table called "{node.alias}". Can\'t join another one with the same name.'
+                )
+            node.type = ast.SelectQueryAliasType(alias=node.alias, select_query_type=node.table.type)
+            scope.tables[node.alias] = node.type
         else:
-            raise ResolverException(f"JoinExpr with table of type {type(node.table).__name__} not supported")
+            node.type = node.table.type
+            scope.anonymous_tables.append(node.type)
+
+        # :TRICKY: Make sure to clone and visit _all_ JoinExpr fields/nodes.
+        if node.table_args is not None:
+            node.table_args = [self.visit(arg) for arg in node.table_args]
+        node.next_join = self.visit(node.next_join)
+        node.constraint = self.visit(node.constraint)
+        node.sample = self.visit(node.sample)
+
+        return node
+
+    def _visit_cte_subquery(self, cte: ast.CTE) -> ast.Expr:
+        """Expand and resolve a subquery CTE. Each reference gets its own resolved copy."""
+        self._enter_cte()
+        resolved = self.visit(clone_expr(cte.expr))
+        self.cte_counter -= 1
+        return resolved
 
     def visit_hogqlx_tag(self, node: ast.HogQLXTag):
         return self.visit(convert_hogqlx_tag(node, self.context.team_id))
@@ -363,7 +441,7 @@ class Resolver(CloningVisitor):
             raise ResolverException("Alias cannot be empty")
 
         node = super().visit_alias(node)
-        node.type = ast.FieldAliasType(alias=node.alias, type=node.expr.type or ast.UnknownType())
+        node.type = ast.FieldAliasType(alias=node.alias, type=node.expr.type or _UNKNOWN_TYPE)
         if not node.hidden:
             scope.aliases[node.alias] = node.type
         return node
@@ -376,28 +454,43 @@ class Resolver(CloningVisitor):
             if node.name == "sparkline":
                 return self.visit(sparkline(node=node, args=node.args))
 
-        node = super().visit_call(node)
+        # Clone the call and collect the types of its arguments in a single pass
+        args: List[ast.Expr] = []
         arg_types: List[ast.ConstantType] = []
         for arg in node.args:
-            if arg.type:
-                arg_types.append(arg.type.resolve_constant_type(self.context) or ast.UnknownType())
-            else:
-                arg_types.append(ast.UnknownType())
+            new_arg = self.visit(arg)
+            args.append(new_arg)
+            arg_types.append(self._resolve_constant_type(new_arg))
+        params: Optional[List[ast.Expr]] = None
         param_types: Optional[List[ast.ConstantType]] = None
         if node.params is not None:
+            params = []
             param_types = []
             for param in node.params:
-                if param.type:
-                    param_types.append(param.type.resolve_constant_type(self.context) or ast.UnknownType())
-                else:
-                    param_types.append(ast.UnknownType())
-        node.type = ast.CallType(
+                new_param = self.visit(param)
+                params.append(new_param)
+                param_types.append(self._resolve_constant_type(new_param))
+
+        # :TRICKY: Make sure to clone and visit _all_ Call fields/nodes.
+        return ast.Call(
+            start=node.start,
+            end=node.end,
+            type=ast.CallType(
+                name=node.name,
+                arg_types=arg_types,
+                param_types=param_types,
+                return_type=_UNKNOWN_TYPE,
+            ),
             name=node.name,
-            arg_types=arg_types,
-            param_types=param_types,
-            return_type=ast.UnknownType(),
+            args=args,
+            params=params,
+            distinct=node.distinct,
         )
-        return node
+
+    def _resolve_constant_type(self, node: ast.Expr) -> ast.ConstantType:
+        if node.type:
+            return node.type.resolve_constant_type(self.context) or _UNKNOWN_TYPE
+        return _UNKNOWN_TYPE
 
     def visit_lambda(self, node: ast.Lambda):
         """Visit each SELECT query or subquery."""
@@ -409,13 +502,13 @@ class Resolver(CloningVisitor):
         for arg in node.args:
             node_type.aliases[arg] = ast.FieldAliasType(alias=arg, type=ast.LambdaArgumentType(name=arg))
 
-        self.scopes.append(node_type)
+        self._push_scope(node_type)
 
         new_node = cast(ast.Lambda, clone_expr(node))
         new_node.type = node_type
         new_node.expr = self.visit(new_node.expr)
 
-        self.scopes.pop()
+        self._pop_scope()
 
         return new_node
 
@@ -436,6 +529,16 @@ class Resolver(CloningVisitor):
         type: Optional[ast.Type] = None
         name = node.chain[0]
 
+        # Fast path for the most common shape, a field on a table in scope, such as "e.event"
+        if len(node.chain) == 2 and isinstance(name, str) and name in scope.tables:
+            child_name = node.chain[1]
+            if isinstance(child_name, str) and child_name != "..":
+                type = scope.tables[name].get_child(child_name, self.context)
+                if type is not None and not isinstance(type, FieldTraverserType):
+                    node.type = type
+                    return self._resolved_field(node, child_name)
+                type = None
+
         # If the field contains at least two parts, the first might be a table.
         if len(node.chain) > 1 and name in scope.tables:
             type = scope.tables[name]
@@ -456,8 +559,8 @@ class Resolver(CloningVisitor):
         if not type:
             type = lookup_field_by_name(scope, name, self.context)
 
-        if not type:
-            cte = lookup_cte_by_name(self.scopes, name)
+        if not type and isinstance(name, str):
+            cte = self.ctes.get(name)
             if cte:
                 if len(node.chain) > 1:
                     raise ResolverException(f"Cannot access fields on CTE {cte.name} yet")
@@ -465,7 +568,7 @@ class Resolver(CloningVisitor):
                 # which is handled in visit_join_expr. Referring to it here means we want to access its value.
                 if cte.cte_type == "subquery":
                     return ast.Field(chain=node.chain)
-                self.cte_counter += 1
+                self._enter_cte()
                 response = self.visit(clone_expr(cte.expr))
                 self.cte_counter -= 1
                 return response
@@ -476,28 +579,33 @@ class Resolver(CloningVisitor):
         # Recursively resolve the rest of the chain until we can point to the deepest node.
         field_name = node.chain[-1]
         loop_type = type
-        chain_to_parse = node.chain[1:]
+        # The rest of the chain, stored in reverse, so that the next part can be popped off the end
+        chain_to_parse = node.chain[:0:-1]
         previous_types = []
         while True:
             if isinstance(loop_type, FieldTraverserType):
-                chain_to_parse = loop_type.chain + chain_to_parse
+                chain_to_parse.extend(reversed(loop_type.chain))
                 loop_type = loop_type.table_type
                 continue
             previous_types.append(loop_type)
             if len(chain_to_parse) == 0:
                 break
-            next_chain = chain_to_parse.pop(0)
+            next_chain = chain_to_parse.pop()
             if next_chain == "..":  # only support one level of ".."
                 previous_types.pop()
                 previous_types.pop()
                 loop_type = previous_types[-1]
-                next_chain = chain_to_parse.pop(0)
+                next_chain = chain_to_parse.pop()
 
             loop_type = loop_type.get_child(next_chain, self.context)
             if loop_type is None:
                 raise ResolverException(f"Cannot resolve type {'.'.join(node.chain)}. Unable to resolve {next_chain}.")
         node.type = loop_type
 
+        return self._resolved_field(node, field_name)
+
+    def _resolved_field(self, node: ast.Field, field_name: str | int) -> ast.Expr:
+        """Swap out expression fields and wrap the typed field `node` in a hidden alias, if needed."""
         if isinstance(node.type, ast.ExpressionFieldType):
             # only swap out expression fields in ClickHouse
             if self.dialect == "clickhouse":
@@ -534,51 +642,46 @@ class Resolver(CloningVisitor):
     def visit_array_access(self, node: ast.ArrayAccess):
         node = super().visit_array_access(node)
 
-        array = node.array
-        while isinstance(array, ast.Alias):
-            array = array.expr
+        array = unwrap_alias(node.array)
 
         if (
             isinstance(array, ast.Field)
             and isinstance(node.property, ast.Constant)
             and (isinstance(node.property.value, str) or isinstance(node.property.value, int))
-            and (
-                (isinstance(array.type, ast.PropertyType))
-                or (
-                    isinstance(array.type, ast.FieldType)
-                    and isinstance(
-                        array.type.resolve_database_field(self.context),
-                        StringJSONDatabaseField,
-                    )
-                )
-            )
         ):
-            array.chain.append(node.property.value)
-            array.type = array.type.get_child(node.property.value, self.context)
-            return array
+            property_type = self._json_property_type(array, node.property.value)
+            if property_type is not None:
+                array.chain.append(node.property.value)
+                array.type = property_type
+                return array
 
         return node
 
     def visit_tuple_access(self, node: ast.TupleAccess):
         node = super().visit_tuple_access(node)
 
-        tuple = node.tuple
-        while isinstance(tuple, ast.Alias):
-            tuple = tuple.expr
+        tuple = unwrap_alias(node.tuple)
 
-        if isinstance(tuple, ast.Field) and (
-            (isinstance(tuple.type, ast.PropertyType))
-            or (
-                isinstance(tuple.type, ast.FieldType)
-                and isinstance(tuple.type.resolve_database_field(self.context), StringJSONDatabaseField)
-            )
-        ):
-            tuple.chain.append(node.index)
-            tuple.type = tuple.type.get_child(node.index, self.context)
-            return tuple
+        if isinstance(tuple, ast.Field):
+            property_type = self._json_property_type(tuple, node.index)
+            if property_type is not None:
+                tuple.chain.append(node.index)
+                tuple.type = property_type
+                return tuple
 
         return node
 
+    def _json_property_type(self, node: ast.Field, name: str | int) -> Optional[ast.Type]:
+        """Type of the `name` property on a JSON field or property, or None if `node` is neither."""
+        if isinstance(node.type, ast.PropertyType):
+            return node.type.get_child(name, self.context)
+        if isinstance(node.type, ast.FieldType):
+            # Resolve the database field once, instead of once here and again in FieldType.get_child
+            database_field = node.type.resolve_database_field(self.context)
+            if isinstance(database_field, StringJSONDatabaseField):
+                return node.type.get_property_type(name, database_field)
+        return None
+
     def visit_constant(self, node: ast.Constant):
         node = super().visit_constant(node)
         node.type = resolve_constant_data_type(node.value)
@@ -586,17 +689,17 @@ class Resolver(CloningVisitor):
 
     def visit_and(self, node: ast.And):
         node = super().visit_and(node)
-        node.type = ast.BooleanType()
+        node.type = _BOOLEAN_TYPE
         return node
 
     def visit_or(self, node: ast.Or):
         node = super().visit_or(node)
-        node.type = ast.BooleanType()
+        node.type = _BOOLEAN_TYPE
         return node
 
     def visit_not(self, node: ast.Not):
         node = super().visit_not(node)
-        node.type = ast.BooleanType()
+        node.type = _BOOLEAN_TYPE
         return node
 
     def visit_compare_operation(self, node: ast.CompareOperation):
@@ -619,12 +722,13 @@ class Resolver(CloningVisitor):
                 )
 
         node = super().visit_compare_operation(node)
-        node.type = ast.BooleanType()
+        node.type = _BOOLEAN_TYPE
 
         if (
             (node.op == ast.CompareOperationOp.In or node.op == ast.CompareOperationOp.NotIn)
-            and self._is_events_table(node.left)
+            # The right side is rarely a subquery, so check it first
             and self._is_s3_cluster(node.right)
+            and self._is_events_table(node.left)
         ):
             if node.op == ast.CompareOperationOp.In:
                 node.op = ast.CompareOperationOp.GlobalIn
@@ -634,27 +738,15 @@ class Resolver(CloningVisitor):
         return node
 
     def _is_events_table(self, node: ast.Expr) -> bool:
-        while isinstance(node, ast.Alias):
-            node = node.expr
+        node = unwrap_alias(node)
         if isinstance(node, ast.Field) and isinstance(node.type, ast.FieldType):
-            if isinstance(node.type.table_type, ast.TableAliasType):
-                return isinstance(node.type.table_type.table_type.table, EventsTable)
-            if isinstance(node.type.table_type, ast.TableType):
-                return isinstance(node.type.table_type.table, EventsTable)
+            return isinstance(self._database_table_of(node.type.table_type), EventsTable)
         return False
 
     def _is_s3_cluster(self, node: ast.Expr) -> bool:
-        while isinstance(node, ast.Alias):
-            node = node.expr
-        if (
-            isinstance(node, ast.SelectQuery)
-            and node.select_from
-            and isinstance(node.select_from.type, ast.BaseTableType)
-        ):
-            if isinstance(node.select_from.type, ast.TableAliasType):
-                return isinstance(node.select_from.type.table_type.table, S3Table)
-            elif isinstance(node.select_from.type, ast.TableType):
-                return isinstance(node.select_from.type.table, S3Table)
+        node = unwrap_alias(node)
+        if isinstance(node, ast.SelectQuery) and node.select_from:
+            return isinstance(self._database_table_of(node.select_from.type), S3Table)
         return False
 
     def _is_next_s3(self, node: Optional[ast.JoinExpr]):
@@ -663,3 +755,11 @@ class Resolver(CloningVisitor):
         if isinstance(node.type, ast.TableAliasType):
             return isinstance(node.type.table_type.table, S3Table)
         return False
+
+    def _database_table_of(self, table_type: Optional[ast.Type]) -> Optional[Table]:
+        """The database table behind a plain or aliased table type, without resolving lazy tables."""
+        if isinstance(table_type, ast.TableAliasType):
+            return table_type.table_type.table
+        if isinstance(table_type, ast.TableType):
+            return table_type.table
+        return None
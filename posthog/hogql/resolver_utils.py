@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, Generic, List, Optional, TypeVar
 
 from posthog import schema
 from posthog.hogql import ast
@@ -6,6 +6,8 @@ from posthog.hogql.context import HogQLContext
 from posthog.hogql.errors import HogQLException, ResolverException, SyntaxException
 from posthog.hogql.visitor import clone_expr
 
+T = TypeVar("T")
+
 
 def lookup_field_by_name(scope: ast.SelectQueryType, name: str, context: HogQLContext) -> Optional[ast.Type]:
     """Looks for a field in the scope's list of aliases and children for each joined table."""
@@ -27,11 +29,39 @@ def lookup_field_by_name(scope: ast.SelectQueryType, name: str, context: HogQLCo
         return None
 
 
-def lookup_cte_by_name(scopes: List[ast.SelectQueryType], name: str) -> Optional[ast.CTE]:
-    for scope in reversed(scopes):
-        if scope and scope.ctes and name in scope.ctes:
-            return scope.ctes[name]
-    return None
+def unwrap_alias(expr: ast.Expr) -> ast.Expr:
+    """The expression behind any number of nested aliases."""
+    # Alias has no subclasses, so an exact type check is enough
+    while type(expr) is ast.Alias:
+        expr = expr.expr
+    return expr
+
+
+class ScopeStack(Generic[T]):
+    """Names bound in nested scopes. Looking up the innermost binding of a name is O(1), and popping a scope only
+    touches the names bound in it."""
+
+    def __init__(self):
+        self._bindings: Dict[str, List[T]] = {}
+        self._frames: List[List[str]] = []
+
+    def push(self) -> None:
+        self._frames.append([])
+
+    def bind(self, name: str, value: T) -> None:
+        self._bindings.setdefault(name, []).append(value)
+        self._frames[-1].append(name)
+
+    def get(self, name: str) -> Optional[T]:
+        values = self._bindings.get(name)
+        return values[-1] if values else None
+
+    def pop(self) -> None:
+        for name in self._frames.pop():
+            values = self._bindings[name]
+            values.pop()
+            if not values:
+                del self._bindings[name]
 
 
 def get_long_table_name(select: ast.SelectQueryType, type: ast.Type) -> str:
@@ -1,4 +1,5 @@
 from datetime import timezone, datetime, date
+from enum import IntEnum
 from typing import Optional, Dict, cast
 import pytest
 from django.test import override_settings
@@ -20,7 +21,7 @@ from posthog.hogql.test.utils import pretty_dataclasses
 from posthog.hogql.visitor import clone_expr
 from posthog.hogql.parser import parse_select
 from posthog.hogql.printer import print_ast, print_prepared_ast
-from posthog.hogql.resolver import ResolverException, resolve_types
+from posthog.hogql.resolver import ResolverException, resolve_constant_data_type, resolve_types
 from posthog.test.base import BaseTest
 
 
@@ -102,14 +103,59 @@ class TestResolver(BaseTest):
                     "tuple": ast.Constant(value=(1, 2, 3)),
                 },
             )
-            expr = resolve_types(expr, self.context, dialect="clickhouse")
+            expr = cast(ast.SelectQuery, resolve_types(expr, self.context, dialect="clickhouse"))
             assert pretty_dataclasses(expr) == self.snapshot
+            # Shared type objects are printed as "<recursion ...>" in the snapshot, so check the types directly too
+            self.assertEqual(
+                [column.type for column in expr.select],
+                [
+                    ast.IntegerType(),
+                    ast.StringType(),
+                    ast.BooleanType(),
+                    ast.FloatType(),
+                    ast.UnknownType(),
+                    ast.DateType(),
+                    ast.DateTimeType(),
+                    ast.UUIDType(),
+                    ast.ArrayType(item_type=ast.UnknownType()),
+                    ast.ArrayType(item_type=ast.IntegerType()),
+                    ast.TupleType(item_types=[ast.IntegerType(), ast.IntegerType(), ast.IntegerType()]),
+                ],
+            )
+
+    def test_resolve_constant_data_type_lists(self):
+        self.assertEqual(resolve_constant_data_type([]), ast.ArrayType(item_type=ast.UnknownType()))
+        self.assertEqual(resolve_constant_data_type([1, 2]), ast.ArrayType(item_type=ast.IntegerType()))
+        self.assertEqual(resolve_constant_data_type([1, "a"]), ast.ArrayType(item_type=ast.UnknownType()))
+        self.assertEqual(resolve_constant_data_type([True, 1]), ast.ArrayType(item_type=ast.UnknownType()))
+        self.assertEqual(resolve_constant_data_type([1, 1.0]), ast.ArrayType(item_type=ast.UnknownType()))
+        self.assertEqual(
+            resolve_constant_data_type([[1], [2]]),
+            ast.ArrayType(item_type=ast.ArrayType(item_type=ast.IntegerType())),
+        )
+        self.assertEqual(
+            resolve_constant_data_type([[1], ["a"]]),
+            ast.ArrayType(item_type=ast.UnknownType()),
+        )
+
+    def test_resolve_constant_data_type_subclasses(self):
+        class Number(IntEnum):
+            ONE = 1
+
+        self.assertEqual(resolve_constant_data_type(Number.ONE), ast.IntegerType())
+        self.assertEqual(resolve_constant_data_type([Number.ONE, 2]), ast.ArrayType(item_type=ast.IntegerType()))
+        with freeze_time("2020-01-10 00:00:00"):
+            now = datetime.now()
+            self.assertEqual(type(now).__name__, "FakeDatetime")
+            self.assertEqual(resolve_constant_data_type(now), ast.DateTimeType())
+            self.assertEqual(resolve_constant_data_type(now.date()), ast.DateType())
 
     @pytest.mark.usefixtures("unittest_snapshot")
     def test_resolve_boolean_operation_types(self):
         expr = self._select("SELECT 1 and 1, 1 or 1, not true")
-        expr = resolve_types(expr, self.context, dialect="clickhouse")
+        expr = cast(ast.SelectQuery, resolve_types(expr, self.context, dialect="clickhouse"))
         assert pretty_dataclasses(expr) == self.snapshot
+        self.assertEqual([column.type for column in expr.select], [ast.BooleanType()] * 3)
 
     def test_resolve_errors(self):
         queries = [
@@ -231,6 +277,82 @@ class TestResolver(BaseTest):
             ),
         )
 
+    def test_ctes_subquery_referenced_twice_is_expanded_separately(self):
+        # Each reference to a subquery CTE is expanded into its own, independently resolved subquery
+        self.assertEqual(
+            self._print_hogql(
+                "with my_table as (select event from events) "
+                "select event from my_table where event in (select event from my_table)"
+            ),
+            self._print_hogql(
+                "select event from (select event from events) as my_table "
+                "where event in (select event from (select event from events) as my_table)"
+            ),
+        )
+
+        node = self._select(
+            "with my_table as (select event from events) "
+            "select event from my_table where event in (select event from my_table)"
+        )
+        node = cast(ast.SelectQuery, resolve_types(node, self.context, dialect="clickhouse"))
+        outer_join = cast(ast.JoinExpr, node.select_from)
+        inner_query = cast(ast.SelectQuery, cast(ast.CompareOperation, node.where).right)
+        outer_table = cast(ast.SelectQuery, outer_join.table)
+        inner_table = cast(ast.SelectQuery, cast(ast.JoinExpr, inner_query.select_from).table)
+        self.assertEqual(outer_table, inner_table)
+        self.assertIsNot(outer_table, inner_table)
+        self.assertIsNot(outer_table.type, inner_table.type)
+
+    def test_ctes_subquery_in_union_arms(self):
+        # Every union arm that references the CTE gets its own expanded subquery
+        query = (
+            "with my_table as (select event from events) "
+            "select event from (select event from my_table union all select event from my_table)"
+        )
+        self.assertEqual(
+            self._print_hogql(query),
+            self._print_hogql(
+                "select event from (select event from (select event from events) as my_table "
+                "union all select event from (select event from events) as my_table)"
+            ),
+        )
+
+        node = cast(ast.SelectQuery, resolve_types(self._select(query), self.context, dialect="clickhouse"))
+        union = cast(ast.SelectUnionQuery, cast(ast.JoinExpr, node.select_from).table)
+        first_table, second_table = [cast(ast.JoinExpr, select.select_from).table for select in union.select_queries]
+        self.assertEqual(first_table, second_table)
+        self.assertIsNot(first_table, second_table)
+
+    def test_ctes_subquery_table_args_are_not_shared(self):
+        node = self._select("with my_table as (select event from events) select event from my_table(1)")
+        resolved = cast(ast.SelectQuery, resolve_types(node, self.context, dialect="clickhouse"))
+        input_join = cast(ast.JoinExpr, node.select_from)
+        resolved_join = cast(ast.JoinExpr, resolved.select_from)
+        self.assertEqual(resolved_join.table_args, [ast.Constant(value=1, type=ast.IntegerType())])
+        self.assertIsNot(resolved_join.table_args, input_join.table_args)
+        self.assertEqual(input_join.table_args, [ast.Constant(value=1)])
+
+    def test_asterisk_expander_resolves_columns_in_scope(self):
+        # Expanded columns are looked up by name in the whole scope, like any other unqualified field
+        with self.assertRaises(ResolverException) as e:
+            self._print_hogql("SELECT e.*, p.* FROM events e JOIN events p ON e.uuid = p.uuid")
+        self.assertEqual(str(e.exception), "Ambiguous query. Found multiple sources for field: uuid")
+
+        with self.assertRaises(ResolverException) as e:
+            self._print_hogql(
+                "SELECT a.* FROM (SELECT event FROM events) a JOIN (SELECT event FROM events) b ON a.event = b.event"
+            )
+        self.assertEqual(str(e.exception), "Ambiguous query. Found multiple sources for field: event")
+
+        node = self._select("SELECT 1 AS event, * FROM events")
+        node = cast(ast.SelectQuery, resolve_types(node, self.context, dialect="clickhouse"))
+        alias_type = node.select[0].type
+        # Other columns are wrapped in hidden aliases, while "event" refers to the "1 AS event" alias instead
+        expanded_event = next(expr for expr in node.select[1:] if isinstance(expr, ast.Field))
+        self.assertEqual(expanded_event.chain, ["event"])
+        self.assertIsInstance(alias_type, ast.FieldAliasType)
+        self.assertIs(expanded_event.type, alias_type)
+
     @override_settings(PERSON_ON_EVENTS_OVERRIDE=False, PERSON_ON_EVENTS_V2_OVERRIDE=False)
     @pytest.mark.usefixtures("unittest_snapshot")
     def test_asterisk_expander_table(self):
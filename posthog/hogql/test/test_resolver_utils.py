@@ -0,0 +1,45 @@
+from posthog.hogql.resolver_utils import ScopeStack
+from posthog.test.base import BaseTest
+
+
+class TestScopeStack(BaseTest):
+    def test_bind_and_get(self):
+        stack: ScopeStack[int] = ScopeStack()
+        stack.push()
+        self.assertIsNone(stack.get("a"))
+        stack.bind("a", 1)
+        stack.bind("b", 2)
+        self.assertEqual(stack.get("a"), 1)
+        self.assertEqual(stack.get("b"), 2)
+        self.assertIsNone(stack.get("c"))
+
+    def test_inner_scope_shadows_outer(self):
+        stack: ScopeStack[int] = ScopeStack()
+        stack.push()
+        stack.bind("a", 1)
+        stack.bind("b", 2)
+        stack.push()
+        stack.bind("a", 3)
+        self.assertEqual(stack.get("a"), 3)
+        self.assertEqual(stack.get("b"), 2)
+
+        stack.pop()
+        self.assertEqual(stack.get("a"), 1)
+        self.assertEqual(stack.get("b"), 2)
+
+    def test_pop_removes_names_bound_in_scope(self):
+        stack: ScopeStack[int] = ScopeStack()
+        stack.push()
+        stack.bind("a", 1)
+        stack.push()
+        stack.bind("b", 2)
+        stack.push()
+        self.assertEqual(stack.get("b"), 2)
+
+        stack.pop()
+        self.assertEqual(stack.get("b"), 2)
+        stack.pop()
+        self.assertIsNone(stack.get("b"))
+        self.assertEqual(stack.get("a"), 1)
+        stack.pop()
+        self.assertIsNone(stack.get("a"))
@@ -5,6 +5,8 @@ from typing import Any
 
 from pydantic import BaseModel
 
+from posthog.hogql.ast import ConstantType
+
 
 def pretty_print_in_tests(query: str, team_id: int) -> str:
     query = (
@@ -30,6 +32,12 @@ def pretty_print_response_in_tests(response: Any, team_id: int) -> str:
     return pretty_print_in_tests(query, team_id)
 
 
+def _is_leaf_constant_type(obj) -> bool:
+    return isinstance(obj, ConstantType) and not any(
+        dataclasses.is_dataclass(getattr(obj, f.name)) for f in dataclasses.fields(obj)
+    )
+
+
 def pretty_dataclasses(obj, seen=None, indent=0):
     if seen is None:
         seen = set()
@@ -41,10 +49,12 @@ def pretty_dataclasses(obj, seen=None, indent=0):
         obj = obj.model_dump()
 
     if dataclasses.is_dataclass(obj):
-        obj_id = id(obj)
-        if obj_id in seen:
-            return "<recursion ...>"
-        seen.add(obj_id)
+        # Constant types without any dataclass children are shared between nodes, but can't recurse
+        if not _is_leaf_constant_type(obj):
+            obj_id = id(obj)
+            if obj_id in seen:
+                return "<recursion ...>"
+            seen.add(obj_id)
 
         field_strings = []
         fields = sorted(dataclasses.fields(obj), key=lambda f: f.name)
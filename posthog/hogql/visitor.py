@@ -416,6 +416,7 @@ class CloningVisitor(Visitor[Any]):
         )
 
     def visit_call(self, node: ast.Call):
+        # :TRICKY: when adding new fields, also add them to visit_call of resolver.py
         return ast.Call(
             start=None if self.clear_locations else node.start,
             end=None if self.clear_locations else node.end,